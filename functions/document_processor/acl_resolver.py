@@ -2,38 +2,115 @@
 
 Uses the Microsoft Graph SDK with a service-principal ClientSecretCredential.
 Group OID resolution results are cached for 5 minutes to limit Graph API traffic
-during bulk delta-sync runs.
+during bulk delta-sync runs.  User-to-group lookups are coalesced into Graph
+JSON $batch calls (20 sub-requests per POST) so documents shared with many
+individual users cost a handful of round-trips instead of one per user.
 """
 
 from __future__ import annotations
 
+import asyncio
+import heapq
 import logging
 import time
+from collections import OrderedDict
 from typing import Any
 
+import httpx
 from kiota_abstractions.base_request_configuration import RequestConfiguration
-from msgraph import GraphServiceClient
 from msgraph.generated.models.permission import Permission
 
-from .config import get_graph_credential
+from .config import get_graph_client, get_graph_credential
 
 logger = logging.getLogger(__name__)
 
 _CACHE_TTL_SECONDS = 300  # 5 minutes
+_GRAPH_SCOPE = "https://graph.microsoft.com/.default"
+_GRAPH_BATCH_URL = "https://graph.microsoft.com/v1.0/$batch"
+# Graph JSON batching accepts at most 20 sub-requests per POST
+_BATCH_MAX_REQUESTS = 20
+# Cap on concurrent single-user memberOf calls in the non-$batch fallback path;
+# keeps the fan-out below Graph's per-app throttling threshold
+_FALLBACK_CONCURRENCY = 8
+# Pool sizing for the shared $batch HTTP client — must exceed the fallback
+# fan-out or concurrent calls queue on connection acquisition
+_HTTPX_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+# Upper bound on cached user→groups entries; beyond this the least recently
+# used entry is dropped so multi-hour bulk syncs cannot grow memory unboundedly
+_CACHE_MAX_ENTRIES = 10_000
+
+# Shared across all AclResolver instances — the webhook handler constructs a
+# resolver per invocation, so rebuilding an HTTP pool per request would redo
+# TLS handshakes on every call.  Created lazily so importing this module
+# stays cheap.
+_BATCH_HTTP: httpx.AsyncClient | None = None
+
+
+def _get_batch_http() -> httpx.AsyncClient:
+    """Return the process-wide httpx client used for Graph $batch POSTs."""
+    global _BATCH_HTTP
+    if _BATCH_HTTP is None:
+        _BATCH_HTTP = httpx.AsyncClient(timeout=30.0, limits=_HTTPX_LIMITS)
+    return _BATCH_HTTP
+
+
+class _TTLCache:
+    """Bounded TTL cache with proactive expiry via a min-heap of expiry times.
+
+    Entries expire after their TTL and are evicted lazily on each get/set by
+    popping the heap, so the cache never accumulates stale entries during
+    long-running delta syncs.  When full, the least recently used entry is
+    evicted (OrderedDict insertion/access order).
+    """
+
+    def __init__(self, max_entries: int = _CACHE_MAX_ENTRIES) -> None:
+        self._max_entries = max_entries
+        self._data: OrderedDict[str, tuple[list[str], float]] = OrderedDict()
+        # (expiry, key) pairs; may contain stale entries for overwritten keys,
+        # which are skipped at pop time by re-checking the dict's expiry
+        self._heap: list[tuple[float, str]] = []
+
+    def get(self, key: str, now: float) -> list[str] | None:
+        self._evict_expired(now)
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expiry = entry
+        if expiry <= now:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: list[str], now: float, ttl: float) -> None:
+        self._evict_expired(now)
+        expiry = now + ttl
+        self._data[key] = (value, expiry)
+        self._data.move_to_end(key)
+        heapq.heappush(self._heap, (expiry, key))
+        while len(self._data) > self._max_entries:
+            self._data.popitem(last=False)
+
+    def _evict_expired(self, now: float) -> None:
+        while self._heap and self._heap[0][0] <= now:
+            _, key = heapq.heappop(self._heap)
+            entry = self._data.get(key)
+            if entry is not None and entry[1] <= now:
+                del self._data[key]
+
+    def __len__(self) -> int:
+        return len(self._data)
 
 
 class AclResolver:
     """Resolve a SharePoint drive item's effective permission list to group OIDs."""
 
     def __init__(self) -> None:
-        credential = get_graph_credential()
+        self._credential = get_graph_credential()
         # Scope required: Sites.Read.All (to read permissions)
-        self._graph = GraphServiceClient(
-            credentials=credential,
-            scopes=["https://graph.microsoft.com/.default"],
-        )
-        # {user_id: (group_oids, expiry_timestamp)}
-        self._user_group_cache: dict[str, tuple[list[str], float]] = {}
+        self._graph = get_graph_client()
+        # user_id -> group_oids with 5-minute TTL, bounded and self-evicting
+        self._user_group_cache = _TTLCache()
 
     # ------------------------------------------------------------------
     # Public interface
@@ -44,16 +121,23 @@ class AclResolver:
         site_id: str,
         drive_id: str,
         item_id: str,
+        saturate_on: set[str] | None = None,
     ) -> list[str]:
         """Return Entra ID group OIDs that have access to the given drive item.
 
         Inspects all permissions (direct + inherited) and:
           - Includes group grantees directly.
           - Resolves user grantees to their Entra group memberships via
-            /users/{id}/memberOf (cached).
+            /users/{id}/memberOf, batched through Graph $batch (cached).
+
+        When *saturate_on* is given and any of those group OIDs already appears
+        among the direct group grantees, user resolution is skipped entirely:
+        downstream search filtering is any-match, so once a broad grant (e.g.
+        "Everyone") is present the per-user memberOf lookups add no reach.
         """
         permissions = await self._get_permissions(site_id, drive_id, item_id)
         group_oids: set[str] = set()
+        user_ids: set[str] = set()
 
         for perm in permissions:
             granted_to = getattr(perm, "granted_to", None)
@@ -73,9 +157,22 @@ class AclResolver:
                     group_oids.add(group.id)
 
                 if user and getattr(user, "id", None):
-                    # Resolve user -> groups (with caching)
-                    user_groups = await self._resolve_user_groups(user.id)
-                    group_oids.update(user_groups)
+                    user_ids.add(user.id)
+
+        if saturate_on and group_oids & saturate_on:
+            logger.debug(
+                "Group set saturated for item %s — skipping %d user lookup(s)",
+                item_id,
+                len(user_ids),
+            )
+            return sorted(group_oids)
+
+        if user_ids:
+            # One clock read per invocation — shared by all cache lookups below
+            now = time.monotonic()
+            resolved = await self._resolve_user_groups_bulk(sorted(user_ids), now)
+            for user_groups in resolved.values():
+                group_oids.update(user_groups)
 
         return sorted(group_oids)
 
@@ -104,17 +201,106 @@ class AclResolver:
             )
             return []
 
-    async def _resolve_user_groups(self, user_id: str) -> list[str]:
-        """Return group OIDs for a user, using the 5-minute in-process cache."""
-        cached = self._user_group_cache.get(user_id)
-        if cached is not None:
-            group_oids, expiry = cached
-            if time.monotonic() < expiry:
-                return group_oids
-
-        group_oids = await self._fetch_user_groups(user_id)
-        self._user_group_cache[user_id] = (group_oids, time.monotonic() + _CACHE_TTL_SECONDS)
-        return group_oids
+    async def _resolve_user_groups_bulk(
+        self, user_ids: list[str], now: float
+    ) -> dict[str, list[str]]:
+        """Return {user_id: group_oids} for each user, hitting Graph only for
+        users missing from the 5-minute in-process cache."""
+        resolved: dict[str, list[str]] = {}
+        pending: list[str] = []
+
+        for user_id in user_ids:
+            cached = self._user_group_cache.get(user_id, now)
+            if cached is not None:
+                resolved[user_id] = cached
+            else:
+                pending.append(user_id)
+
+        if pending:
+            fetched = await self._fetch_user_groups_bulk(pending)
+            for user_id, group_oids in fetched.items():
+                self._user_group_cache.set(user_id, group_oids, now, _CACHE_TTL_SECONDS)
+                resolved[user_id] = group_oids
+
+        return resolved
+
+    async def _fetch_user_groups_bulk(
+        self, user_ids: list[str]
+    ) -> dict[str, list[str]]:
+        """Fetch group memberships for many users via Graph JSON $batch.
+
+        Issues one POST per 20 users instead of one GET per user.  Sub-request
+        failures (and whole-batch failures) fall back to the single-user path
+        so one bad user never loses the rest of the batch.
+        """
+        results: dict[str, list[str]] = {}
+
+        for batch_start in range(0, len(user_ids), _BATCH_MAX_REQUESTS):
+            batch = user_ids[batch_start : batch_start + _BATCH_MAX_REQUESTS]
+            body = {
+                "requests": [
+                    {
+                        "id": str(i),
+                        "method": "GET",
+                        "url": f"/users/{user_id}/memberOf?$select=id",
+                    }
+                    for i, user_id in enumerate(batch)
+                ]
+            }
+            try:
+                token = self._credential.get_token(_GRAPH_SCOPE).token
+                response = await _get_batch_http().post(
+                    _GRAPH_BATCH_URL,
+                    json=body,
+                    headers={"Authorization": f"Bearer {token}"},
+                )
+                response.raise_for_status()
+                payload = response.json()
+            except Exception:
+                logger.exception(
+                    "Graph $batch memberOf call failed for %d user(s) — "
+                    "falling back to concurrent per-user requests",
+                    len(batch),
+                )
+                results.update(await self._resolve_many(batch))
+                continue
+
+            for sub_response in payload.get("responses", []):
+                user_id = batch[int(sub_response["id"])]
+                if sub_response.get("status") != 200:
+                    logger.warning(
+                        "Graph $batch sub-request failed for user %s (status %s) — "
+                        "retrying individually",
+                        user_id,
+                        sub_response.get("status"),
+                    )
+                    results[user_id] = await self._fetch_user_groups(user_id)
+                    continue
+                sub_body = sub_response.get("body") or {}
+                results[user_id] = [
+                    obj["id"]
+                    for obj in sub_body.get("value", [])
+                    if obj.get("id")
+                    and "#microsoft.graph.group" in (obj.get("@odata.type") or "")
+                ]
+
+        return results
+
+    async def _resolve_many(self, user_ids: list[str]) -> dict[str, list[str]]:
+        """Resolve many users with concurrent single-user memberOf calls.
+
+        Fallback for when $batch is unavailable: schedules all lookups on the
+        event loop at once, bounded by a semaphore, so N uncached users cost
+        roughly one round-trip of latency instead of N sequential ones.
+        """
+        sem = asyncio.Semaphore(_FALLBACK_CONCURRENCY)
+
+        async def one(user_id: str) -> list[str]:
+            async with sem:
+                return await self._fetch_user_groups(user_id)
+
+        groups = await asyncio.gather(*(one(u) for u in user_ids))
+        return dict(zip(user_ids, groups))
 
     async def _fetch_user_groups(self, user_id: str) -> list[str]:
         """Call Graph /users/{id}/memberOf and extract group OIDs."""
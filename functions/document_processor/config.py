@@ -1,8 +1,16 @@
 """Central configuration — all env vars and shared Azure credential instances."""
 
+from __future__ import annotations
+
 import os
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
 from azure.identity import DefaultAzureCredential, ClientSecretCredential
 
+if TYPE_CHECKING:
+    from msgraph import GraphServiceClient
+
 # ---------------------------------------------------------------------------
 # Azure AI Search
 # ---------------------------------------------------------------------------
@@ -23,6 +31,10 @@ AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT: str = os.environ[
     "AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT"
 ]
 
+# Optional GPU-accelerated OCR service for scanned PDFs (empty = disabled,
+# scanned documents route to Document Intelligence instead)
+GPU_OCR_ENDPOINT: str = os.getenv("GPU_OCR_ENDPOINT", "")
+
 # ---------------------------------------------------------------------------
 # SharePoint / Graph API — service principal (client credentials)
 # ---------------------------------------------------------------------------
@@ -30,6 +42,12 @@ SHAREPOINT_TENANT_ID: str = os.environ["SHAREPOINT_TENANT_ID"]
 SHAREPOINT_CLIENT_ID: str = os.environ["SHAREPOINT_CLIENT_ID"]
 SHAREPOINT_CLIENT_SECRET: str = os.environ["SHAREPOINT_CLIENT_SECRET"]
 
+# Broad-grant group OIDs (comma-separated, e.g. the tenant "Everyone" /
+# all-employees groups).  When an item already grants one of these, per-user
+# memberOf resolution is skipped — search filtering is any-match, so the
+# extra lookups add no reach.
+ACL_SATURATION_GROUP_OIDS: str = os.getenv("ACL_SATURATION_GROUP_OIDS", "")
+
 # ---------------------------------------------------------------------------
 # Azure Table Storage (delta-link persistence)
 # ---------------------------------------------------------------------------
@@ -38,12 +56,18 @@ AZURE_STORAGE_CONNECTION_STRING: str = os.getenv(
 )
 DELTA_LINK_TABLE_NAME: str = os.getenv("DELTA_LINK_TABLE_NAME", "deltalinks")
 
+# Storage queue that decouples webhook 202 latency from pipeline cost
+INGEST_QUEUE_NAME: str = os.getenv("INGEST_QUEUE_NAME", "ingest-items")
+
 # ---------------------------------------------------------------------------
 # SharePoint libraries to sync (comma-separated site:drive pairs)
 # Format: "siteId1|driveId1,siteId2|driveId2"
 # ---------------------------------------------------------------------------
 SHAREPOINT_LIBRARIES: str = os.getenv("SHAREPOINT_LIBRARIES", "")
 
+# OAuth scope for all Microsoft Graph calls
+GRAPH_SCOPE: str = "https://graph.microsoft.com/.default"
+
 
 def get_default_credential() -> DefaultAzureCredential:
     """Return a DefaultAzureCredential suitable for Azure SDK clients.
@@ -54,14 +78,35 @@ def get_default_credential() -> DefaultAzureCredential:
     return DefaultAzureCredential()
 
 
+@lru_cache(maxsize=1)
 def get_graph_credential() -> ClientSecretCredential:
     """Return a ClientSecretCredential for Microsoft Graph API calls.
 
     Graph does not support managed identity scopes in all tenants, so we use
     a dedicated service principal with least-privilege Graph permissions.
+
+    Memoized so every caller shares one credential (and its token cache)
+    instead of re-acquiring tokens per instantiation.
     """
     return ClientSecretCredential(
         tenant_id=SHAREPOINT_TENANT_ID,
         client_id=SHAREPOINT_CLIENT_ID,
         client_secret=SHAREPOINT_CLIENT_SECRET,
     )
+
+
+@lru_cache(maxsize=1)
+def get_graph_client() -> GraphServiceClient:
+    """Return the process-wide GraphServiceClient.
+
+    The SDK client owns an HTTP pipeline and connection pool; memoizing it
+    here gives every caller (webhook, delta sync, ACL resolution) one shared
+    pool and token cache instead of a fresh TLS handshake and AAD round-trip
+    per invocation.  Imported lazily so loading config stays cheap.
+    """
+    from msgraph import GraphServiceClient
+
+    return GraphServiceClient(
+        credentials=get_graph_credential(),
+        scopes=[GRAPH_SCOPE],
+    )
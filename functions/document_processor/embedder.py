@@ -6,8 +6,12 @@ so no API key is stored in config or environment variables.
 
 from __future__ import annotations
 
+import base64
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
+import httpx
+import numpy as np
 import openai
 from azure.identity import get_bearer_token_provider
 from openai import AzureOpenAI
@@ -31,6 +35,17 @@ logger = logging.getLogger(__name__)
 _EMBEDDING_DIMENSIONS = 1536
 # Stay well within the per-request token limit; ada-002 supports up to 2048 inputs/call
 _MAX_BATCH_SIZE = 16
+# In-flight embedding requests; Azure OpenAI deployments tolerate well above
+# this, but 8 keeps us clear of per-deployment TPM throttling
+_MAX_PARALLEL_REQUESTS = 8
+
+# Shared across invocations so each embed_batch call doesn't pay thread startup
+_EXECUTOR = ThreadPoolExecutor(max_workers=_MAX_PARALLEL_REQUESTS)
+
+# Pool must comfortably exceed the concurrent slice count or parallel calls
+# serialize on connection acquisition; HTTP/2 multiplexes them over fewer
+# TCP/TLS connections
+_HTTPX_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
 
 
 class TextEmbedder:
@@ -41,22 +56,62 @@ class TextEmbedder:
             get_default_credential(),
             "https://cognitiveservices.azure.com/.default",
         )
+        self._http = httpx.Client(
+            limits=_HTTPX_LIMITS,
+            timeout=30.0,
+            http2=True,
+        )
         self._client = AzureOpenAI(
             azure_endpoint=AZURE_OPENAI_ENDPOINT,
             azure_ad_token_provider=token_provider,
             # api_version that supports text-embedding-3-* and ada-002
             api_version="2024-02-01",
+            http_client=self._http,
         )
 
+    def close(self) -> None:
+        """Close the underlying HTTP connection pool."""
+        self._http.close()
+
+    def __enter__(self) -> TextEmbedder:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
     # ------------------------------------------------------------------
     # Public interface
     # ------------------------------------------------------------------
 
-    def embed(self, text: str) -> list[float]:
-        """Return a 1536-dimensional embedding vector for *text*."""
+    def embed(self, text: str) -> np.ndarray:
+        """Return a 1536-dimensional float32 embedding vector for *text*."""
         vectors = self.embed_batch([text])
         return vectors[0]
 
+    def embed_batch(self, texts: list[str]) -> np.ndarray:
+        """Return embeddings as a float32 array of shape (len(texts), 1536).
+
+        A contiguous float32 matrix is ~4x smaller than the equivalent nested
+        Python lists and is cheap to slice per-chunk downstream.  Slices are
+        submitted to a shared thread pool so up to 8 requests are in flight at
+        once; results are gathered in submission order so row order matches
+        input order.  Each slice retries independently on rate-limit or
+        transient API errors.
+        """
+        if not texts:
+            return np.empty((0, _EMBEDDING_DIMENSIONS), dtype=np.float32)
+
+        futures = [
+            _EXECUTOR.submit(self._embed_one, texts[start : start + _MAX_BATCH_SIZE], start)
+            for start in range(0, len(texts), _MAX_BATCH_SIZE)
+        ]
+
+        return np.vstack([future.result() for future in futures])
+
+    # ------------------------------------------------------------------
+    # Private helpers
+    # ------------------------------------------------------------------
+
     @retry(
         retry=retry_if_exception_type((openai.RateLimitError, openai.APIStatusError)),
         stop=stop_after_attempt(3),
@@ -64,29 +119,25 @@ class TextEmbedder:
         before_sleep=before_sleep_log(logger, logging.WARNING),
         reraise=True,
     )
-    def embed_batch(self, texts: list[str]) -> list[list[float]]:
-        """Return embeddings for a list of texts, batching at most 16 per call.
+    def _embed_one(self, batch: list[str], offset: int) -> np.ndarray:
+        """Embed a single <=16-text slice into a (len(batch), 1536) array.
 
-        Preserves input order in the returned list.
         Retries up to 3 times on rate-limit or transient API errors with
         exponential backoff (2s–30s) before re-raising.
         """
-        if not texts:
-            return []
-
-        all_vectors: list[list[float]] = []
-        for batch_start in range(0, len(texts), _MAX_BATCH_SIZE):
-            batch = texts[batch_start : batch_start + _MAX_BATCH_SIZE]
-            logger.debug(
-                "Embedding batch of %d texts (offset %d)", len(batch), batch_start
-            )
-            response = self._client.embeddings.create(
-                input=batch,
-                model=OPENAI_EMBEDDING_DEPLOYMENT,
-                dimensions=_EMBEDDING_DIMENSIONS,
-            )
-            # Response items are ordered by index, so safe to extend directly
-            batch_vectors = [item.embedding for item in response.data]
-            all_vectors.extend(batch_vectors)
-
-        return all_vectors
+        logger.debug("Embedding batch of %d texts (offset %d)", len(batch), offset)
+        # base64 packs float32 vectors ~4x tighter than a JSON float array and
+        # skips per-float JSON parsing; decode straight into numpy
+        response = self._client.embeddings.create(
+            input=batch,
+            model=OPENAI_EMBEDDING_DEPLOYMENT,
+            dimensions=_EMBEDDING_DIMENSIONS,
+            encoding_format="base64",
+        )
+        # Response items are ordered by index, so safe to stack directly
+        return np.vstack(
+            [
+                np.frombuffer(base64.b64decode(item.embedding), dtype=np.float32)
+                for item in response.data
+            ]
+        )
@@ -0,0 +1,65 @@
+"""Async client for an external GPU-accelerated OCR service.
+
+Scanned PDFs dominate pipeline latency when OCR runs on Functions CPU; a
+GPU-backed service (e.g. PaddleOCR or Surya on an Azure Container App)
+processes them an order of magnitude faster, and accepting a batch of
+documents per request amortizes model dispatch overhead across items.
+
+Disabled unless GPU_OCR_ENDPOINT is configured — callers fall back to the
+Document Intelligence path in OcrProcessor.
+"""
+
+from __future__ import annotations
+
+import base64
+import logging
+
+import httpx
+
+from .config import GPU_OCR_ENDPOINT
+
+logger = logging.getLogger(__name__)
+
+# Scanned-PDF OCR for a large batch can legitimately take minutes
+_TIMEOUT_SECONDS = 300.0
+_HTTPX_LIMITS = httpx.Limits(max_connections=16, max_keepalive_connections=8)
+
+_HTTP: httpx.AsyncClient | None = None
+
+
+def enabled() -> bool:
+    """Return True when a GPU OCR endpoint is configured."""
+    return bool(GPU_OCR_ENDPOINT)
+
+
+def _get_http() -> httpx.AsyncClient:
+    global _HTTP
+    if _HTTP is None:
+        _HTTP = httpx.AsyncClient(timeout=_TIMEOUT_SECONDS, limits=_HTTPX_LIMITS)
+    return _HTTP
+
+
+async def batch_ocr(documents: list[bytes]) -> list[str]:
+    """OCR many documents in one request, returning page-marked text per input.
+
+    Documents are sent base64-encoded in a single JSON POST; the service
+    returns a 'texts' array aligned with the input order, using the same
+    '--- Page N ---' markers OcrProcessor emits so downstream chunking is
+    source-agnostic.
+    """
+    if not documents:
+        return []
+
+    payload = {
+        "documents": [base64.b64encode(doc).decode() for doc in documents]
+    }
+    response = await _get_http().post(
+        f"{GPU_OCR_ENDPOINT.rstrip('/')}/ocr", json=payload
+    )
+    response.raise_for_status()
+    texts = response.json().get("texts", [])
+    if len(texts) != len(documents):
+        raise ValueError(
+            f"GPU OCR returned {len(texts)} result(s) for {len(documents)} document(s)"
+        )
+    return [str(text) for text in texts]
@@ -8,9 +8,21 @@ filter query against the stored document_id field.
 from __future__ import annotations
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
-from azure.search.documents import SearchClient
+import numpy as np
+import orjson
+from azure.core.exceptions import HttpResponseError
+from azure.core.rest import HttpRequest
+from azure.search.documents import IndexDocumentsBatch, SearchClient
 from azure.search.documents.models import IndexingResult
+from tenacity import (
+    before_sleep_log,
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential,
+)
 
 from .config import (
     AZURE_SEARCH_ENDPOINT,
@@ -21,6 +33,21 @@ from .config import (
 logger = logging.getLogger(__name__)
 
 _BATCH_SIZE = 100
+# REST API version for the orjson fast-path; matches azure-search-documents 11.6
+_API_VERSION = "2024-07-01"
+_INDEX_DOCS_URL = (
+    f"{AZURE_SEARCH_ENDPOINT}/indexes('{AZURE_SEARCH_INDEX_NAME}')/docs/search.index"
+)
+# Concurrent batch uploads; the search service absorbs several in-flight
+# writes per partition before throttling
+_MAX_PARALLEL_BATCHES = 4
+
+# Shared across invocations so each upsert call doesn't pay thread startup
+_EXECUTOR = ThreadPoolExecutor(max_workers=_MAX_PARALLEL_BATCHES)
+
+
+def _is_throttled(exc: BaseException) -> bool:
+    return isinstance(exc, HttpResponseError) and exc.status_code in (429, 503)
 
 
 class IndexPusher:
@@ -41,82 +68,88 @@ class IndexPusher:
         """Merge-or-upload *chunks* into the search index in batches of 100.
 
         Each chunk dict must contain at minimum an 'id' field (the index key).
-        Failed documents within a batch are logged but do not raise so that a
-        single bad chunk does not abort the whole batch.
+        Per-document failures are logged and then raised, so callers that
+        gate skip-guards (content hash, ETag) on a successful push never
+        commit them after a partial one.
         """
-        if not chunks:
+        self.batch_actions(
+            [{**chunk, "@search.action": "mergeOrUpload"} for chunk in chunks]
+        )
+
+    def batch_actions(self, actions: list[dict]) -> None:
+        """Send pre-built index actions, mixing mergeOrUpload and delete freely.
+
+        Azure Search accepts mixed '@search.action' values in one
+        indexDocuments call, so an upsert plus its stale-chunk deletes cost a
+        single round-trip.  Actions are split into batches of 100 and sent in
+        parallel on the shared executor — but all upsert batches complete
+        before any delete batch is submitted, so replacing a document's chunk
+        set never has a window where the old chunks are gone and the new ones
+        have not landed yet.
+        """
+        if not actions:
             return
 
-        for batch_start in range(0, len(chunks), _BATCH_SIZE):
-            batch = chunks[batch_start : batch_start + _BATCH_SIZE]
-            logger.info(
-                "Upserting batch of %d chunks (offset %d)", len(batch), batch_start
-            )
-            results: list[IndexingResult] = self._client.merge_or_upload_documents(
-                documents=batch
+        upserts = [a for a in actions if a.get("@search.action") != "delete"]
+        deletes = [a for a in actions if a.get("@search.action") == "delete"]
+        self._submit_batches(upserts)
+        self._submit_batches(deletes)
+
+    def _submit_batches(self, actions: list[dict]) -> None:
+        """Split *actions* into 100-action batches and upload them in parallel."""
+        if not actions:
+            return
+        futures = [
+            _EXECUTOR.submit(
+                self._upload_batch, actions[batch_start : batch_start + _BATCH_SIZE]
             )
-            self._log_results(results)
+            for batch_start in range(0, len(actions), _BATCH_SIZE)
+        ]
+        for future in futures:
+            future.result()
 
     def get_chunk_ids(self, document_id: str) -> set[str]:
         """Return the set of all chunk IDs currently indexed for *document_id*.
 
         Used before upserting a new version so we can compute which old chunks
         are no longer present and delete only those (avoids delete-all data-loss window).
+
+        Results are streamed page by page via the SDK's continuation handling,
+        so documents with more than 1 000 chunks are returned in full rather
+        than silently truncated at the old top cap.
         """
         chunk_ids: set[str] = set()
         results = self._client.search(
-            search_text="*",
+            search_text="",
             filter=f"document_id eq '{_escape_odata(document_id)}'",
             select=["id"],
-            top=1000,
         )
-        for r in results:
-            chunk_ids.add(r["id"])
+        for page in results.by_page():
+            for r in page:
+                chunk_ids.add(r["id"])
         return chunk_ids
 
     def delete_chunks(self, chunk_ids: set[str]) -> None:
         """Delete a specific set of chunks by their IDs."""
         if not chunk_ids:
             return
-        ids_list = list(chunk_ids)
-        for batch_start in range(0, len(ids_list), _BATCH_SIZE):
-            batch = [{"id": cid} for cid in ids_list[batch_start : batch_start + _BATCH_SIZE]]
-            self._client.delete_documents(documents=batch)
-            logger.info("Deleted %d stale chunk(s)", len(batch))
+        self.batch_actions(
+            [{"id": cid, "@search.action": "delete"} for cid in chunk_ids]
+        )
+        logger.info("Deleted %d stale chunk(s)", len(chunk_ids))
 
     def delete_document(self, document_id: str) -> None:
         """Remove every chunk belonging to *document_id* from the index.
 
-        Searches for all chunks where the 'document_id' field matches, then
-        issues a batch delete.  The loop continues until no results remain to
-        handle indexes with more than 1 000 matching chunks.
+        Collects the full chunk-ID set with one paged query, then deletes in
+        batches — instead of the old search/delete polling loop that paid two
+        sequential round-trips per 100 chunks.
         """
-        deleted_total = 0
-        while True:
-            results = self._client.search(
-                search_text="*",
-                filter=f"document_id eq '{_escape_odata(document_id)}'",
-                select=["id"],
-                top=_BATCH_SIZE,
-            )
-            batch = [{"id": r["id"]} for r in results]
-            if not batch:
-                break
-            self._client.delete_documents(documents=batch)
-            deleted_total += len(batch)
-            logger.info(
-                "Deleted %d chunks for document_id=%s (running total: %d)",
-                len(batch),
-                document_id,
-                deleted_total,
-            )
-            if len(batch) < _BATCH_SIZE:
-                # Fewer than a full batch returned — we've reached the end
-                break
-
+        chunk_ids = self.get_chunk_ids(document_id)
+        self.delete_chunks(chunk_ids)
         logger.info(
             "Finished deleting %d total chunks for document_id=%s",
-            deleted_total,
+            len(chunk_ids),
             document_id,
         )
 
@@ -124,18 +157,114 @@ class IndexPusher:
     # Private helpers
     # ------------------------------------------------------------------
 
+    def _upload_batch(self, batch: list[dict]) -> None:
+        """Send one batch of index actions, preferring the orjson fast path.
+
+        Each action dict carries its own '@search.action'.  orjson serializes
+        the payload (including float32 numpy vectors, via OPT_SERIALIZE_NUMPY)
+        5-10x faster than the SDK's stdlib-json serializer.  Throttled
+        responses (429/503) retry with exponential backoff; any other failure
+        in the fast path falls back to the SDK's index_documents for that
+        batch.  Per-document failures on either path raise after logging.
+        """
+        logger.info("Sending index batch of %d action(s)", len(batch))
+        try:
+            payload = orjson.dumps(
+                {"value": batch},
+                option=orjson.OPT_SERIALIZE_NUMPY,
+            )
+            body = self._send_index_batch(payload)
+        except Exception:
+            logger.exception(
+                "orjson index fast path failed — retrying batch via SDK serializer"
+            )
+            sdk_batch = IndexDocumentsBatch()
+            for action in batch:
+                document = _prep(
+                    {k: v for k, v in action.items() if k != "@search.action"}
+                )
+                if action.get("@search.action") == "delete":
+                    sdk_batch.add_delete_actions(document)
+                else:
+                    sdk_batch.add_merge_or_upload_actions(document)
+            results: list[IndexingResult] = self._client.index_documents(
+                batch=sdk_batch
+            )
+            self._check_results(results)
+            return
+
+        failed = 0
+        for result in body.get("value", []):
+            if not result.get("status"):
+                failed += 1
+                logger.error(
+                    "Index action failed for key=%s: status=%s error=%s",
+                    result.get("key"),
+                    result.get("statusCode"),
+                    result.get("errorMessage"),
+                )
+        if failed:
+            raise RuntimeError(
+                f"{failed} of {len(batch)} index action(s) failed in batch"
+            )
+
+    @retry(
+        retry=retry_if_exception(_is_throttled),
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=30),
+        before_sleep=before_sleep_log(logger, logging.WARNING),
+        reraise=True,
+    )
+    def _send_index_batch(self, payload: bytes) -> dict:
+        """POST a pre-serialized index batch through the client's pipeline."""
+        request = HttpRequest(
+            method="POST",
+            url=_INDEX_DOCS_URL,
+            params={"api-version": _API_VERSION},
+            headers={"Content-Type": "application/json"},
+            content=payload,
+        )
+        response = self._client.send_request(request)
+        response.raise_for_status()
+        return orjson.loads(response.read())
+
     @staticmethod
-    def _log_results(results: list[IndexingResult]) -> None:
+    def _check_results(results: list[IndexingResult]) -> None:
+        """Log every failed key, then raise if any action in the batch failed.
+
+        A partially failed push must propagate: downstream skip-guards
+        (content hash, durable ETag) are only committed on success, and a
+        swallowed failure would mark the document indexed with chunks
+        missing — never retried until its content actually changes.
+        """
+        failed = 0
         for result in results:
             if not result.succeeded:
+                failed += 1
                 logger.error(
-                    "Index upsert failed for key=%s: status=%s error=%s",
+                    "Index action failed for key=%s: status=%s error=%s",
                     result.key,
                     result.status_code,
                     result.error_message,
                 )
+        if failed:
+            raise RuntimeError(
+                f"{failed} of {len(results)} index action(s) failed in batch"
+            )
 
 
 def _escape_odata(value: str) -> str:
     """Escape single quotes in OData filter string values."""
     return value.replace("'", "''")
+
+
+def _prep(chunk: dict) -> dict:
+    """Return a JSON-serializable copy of a chunk document.
+
+    Embedding vectors arrive as float32 numpy rows; ndarray.tolist() is the
+    single C-level conversion the SDK's JSON serializer needs.
+    """
+    vector = chunk.get("content_vector")
+    if isinstance(vector, np.ndarray):
+        chunk = {**chunk, "content_vector": vector.tolist()}
+    return chunk
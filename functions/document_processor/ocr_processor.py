@@ -10,20 +10,33 @@ from __future__ import annotations
 
 import io
 import logging
-from typing import TYPE_CHECKING
-
-import fitz  # PyMuPDF
-from azure.ai.documentintelligence import DocumentIntelligenceClient
-from azure.ai.documentintelligence.models import AnalyzeDocumentRequest
-from docx import Document as DocxDocument
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, TYPE_CHECKING, Any
 
 from .config import AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT, get_default_credential
 
+if TYPE_CHECKING:
+    from azure.ai.documentintelligence import DocumentIntelligenceClient
+
+# PyMuPDF, python-docx, and the Document Intelligence SDK each add tens to
+# hundreds of milliseconds of import time; they are imported lazily inside the
+# methods that need them so a cold Functions start (and e.g. a DOCX-only
+# invocation) never pays for the others.
+
 logger = logging.getLogger(__name__)
 
 # Heuristic threshold: fewer than this many chars/page → treat as scanned
 _CHARS_PER_PAGE_THRESHOLD = 100
 
+# Below this page count the thread fan-out costs more than it saves
+_PARALLEL_PAGE_THRESHOLD = 16
+_MAX_EXTRACT_WORKERS = 8
+
+# Scanned PDFs above one shard's worth of pages are OCR'd as concurrent
+# page-range analyses so a single huge document cannot run the function
+# into its timeout serially
+_OCR_SHARD_PAGES = 50
+
 
 class OcrProcessor:
     """Extract text from PDF and DOCX documents, routing to OCR when needed."""
@@ -35,6 +48,8 @@ class OcrProcessor:
     def _client(self) -> DocumentIntelligenceClient:
         """Lazy-initialise the Document Intelligence client (avoids cold-start cost)."""
         if self._doc_intelligence_client is None:
+            from azure.ai.documentintelligence import DocumentIntelligenceClient
+
             self._doc_intelligence_client = DocumentIntelligenceClient(
                 endpoint=AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT,
                 credential=get_default_credential(),
@@ -51,38 +66,52 @@ class OcrProcessor:
         Uses PyMuPDF to read text; if the average chars-per-page falls below
         the threshold the document is assumed to be a scanned image PDF.
         """
-        try:
-            doc = fitz.open(stream=content, filetype="pdf")  # type: ignore[call-arg]
-            if doc.page_count == 0:
-                return True
-            total_chars = sum(len(page.get_text()) for page in doc)
-            avg_chars = total_chars / doc.page_count
-            doc.close()
-            return avg_chars < _CHARS_PER_PAGE_THRESHOLD
-        except Exception:
-            logger.exception("PyMuPDF failed during scanned-PDF heuristic")
-            # Fall back to OCR if we cannot determine the type
+        doc, avg_chars = self._open_and_probe(content)
+        if doc is None:
             return True
+        doc.close()
+        return avg_chars < _CHARS_PER_PAGE_THRESHOLD
+
+    def needs_ocr(self, content: bytes) -> bool:
+        """Return True when *content* is a PDF without a usable text layer."""
+        return self.is_scanned_pdf(content)
 
-    def extract_text(self, content: bytes, filename: str) -> str:
+    def extract_text(self, content: bytes | IO[bytes], filename: str) -> str:
         """Return structured text with '--- Page N ---' markers.
 
+        *content* may be raw bytes or a readable binary file-like (e.g. the
+        SpooledTemporaryFile produced by the streaming downloader); file-likes
+        are drained once up front since PyMuPDF and Document Intelligence both
+        need random access to the full buffer.
+
         Routing:
           *.docx  -> python-docx
           *.pdf with native text -> PyMuPDF
           *.pdf scanned/image   -> Document Intelligence
         """
+        if not isinstance(content, (bytes, bytearray)):
+            content.seek(0)
+            content = content.read()
         lower = filename.lower()
 
         if lower.endswith(".docx"):
             return self._extract_docx(content)
 
         if lower.endswith(".pdf"):
-            if self.is_scanned_pdf(content):
+            # Open once and reuse the handle for both the scanned heuristic
+            # and native extraction — PDF parsing is the expensive step
+            doc, avg_chars = self._open_and_probe(content)
+            if doc is None or avg_chars < _CHARS_PER_PAGE_THRESHOLD:
+                page_count = doc.page_count if doc is not None else None
+                if doc is not None:
+                    doc.close()
                 logger.info("Routing %s to Document Intelligence OCR", filename)
-                return self._extract_pdf_ocr(content)
+                return self._extract_pdf_ocr(content, page_count)
             logger.info("Routing %s to PyMuPDF native extraction", filename)
-            return self._extract_pdf_native(content)
+            try:
+                return self._extract_pdf_native_from(doc, content)
+            finally:
+                doc.close()
 
         # Unsupported format — return raw bytes decoded best-effort
         logger.warning("Unsupported file type for '%s'; attempting UTF-8 decode", filename)
@@ -92,39 +121,119 @@ class OcrProcessor:
     # Private helpers
     # ------------------------------------------------------------------
 
-    def _extract_pdf_native(self, content: bytes) -> str:
-        """Extract text from a native (searchable) PDF using PyMuPDF."""
-        doc = fitz.open(stream=content, filetype="pdf")  # type: ignore[call-arg]
+    def _open_and_probe(self, content: bytes) -> tuple[Any, float]:
+        """Open a PDF with PyMuPDF and return (document, avg_chars_per_page).
+
+        Returns (None, 0.0) when PyMuPDF cannot parse the content (the
+        caller falls back to OCR).  The caller owns closing the document.
+        """
+        import fitz  # PyMuPDF
+
         try:
-            pages: list[str] = []
-            for page_num, page in enumerate(doc, start=1):
-                text = page.get_text().strip()
-                if text:
-                    pages.append(f"--- Page {page_num} ---\n{text}")
-            return "\n\n".join(pages)
-        finally:
+            doc = fitz.open(stream=content, filetype="pdf")  # type: ignore[call-arg]
+        except Exception:
+            logger.exception("PyMuPDF failed during scanned-PDF heuristic")
+            return None, 0.0
+        if doc.page_count == 0:
             doc.close()
+            return None, 0.0
+        total_chars = sum(len(page.get_text()) for page in doc)
+        return doc, total_chars / doc.page_count
 
-    def _extract_pdf_ocr(self, content: bytes) -> str:
-        """Send a scanned PDF to Document Intelligence and return page-marked text."""
-        poller = self._client.begin_analyze_document(
-            "prebuilt-read",
-            AnalyzeDocumentRequest(bytes_source=content),
-        )
-        result = poller.result()
+    def _extract_pdf_native_from(self, doc: Any, content: bytes) -> str:
+        """Extract text from an already-open native (searchable) PDF.
 
-        if not result.pages:
-            return ""
+        Large documents fan page extraction out across a thread pool.  MuPDF
+        releases the GIL inside get_text but a fitz.Document is not safe for
+        concurrent page access, so each worker opens its own handle over
+        *content* and extracts a contiguous page range.
+        """
+        page_count = doc.page_count
+        if page_count < _PARALLEL_PAGE_THRESHOLD:
+            entries = [
+                (page_num, page.get_text().strip())
+                for page_num, page in enumerate(doc, start=1)
+            ]
+        else:
+            workers = min(_MAX_EXTRACT_WORKERS, page_count)
+            shard_size = -(-page_count // workers)  # ceil division
+            ranges = [
+                (start, min(start + shard_size, page_count))
+                for start in range(0, page_count, shard_size)
+            ]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                shards = executor.map(
+                    lambda r: self._extract_page_range(content, r[0], r[1]), ranges
+                )
+                entries = [entry for shard in shards for entry in shard]
+
+        pages = [
+            f"--- Page {page_num} ---\n{text}"
+            for page_num, text in entries
+            if text
+        ]
+        return "\n\n".join(pages)
+
+    @staticmethod
+    def _extract_page_range(
+        content: bytes, start: int, end: int
+    ) -> list[tuple[int, str]]:
+        """Extract pages [start, end) using a worker-local PyMuPDF handle."""
+        import fitz  # PyMuPDF
+
+        local_doc = fitz.open(stream=content, filetype="pdf")  # type: ignore[call-arg]
+        try:
+            return [
+                (i + 1, local_doc[i].get_text().strip()) for i in range(start, end)
+            ]
+        finally:
+            local_doc.close()
+
+    def _extract_pdf_ocr(self, content: bytes, page_count: int | None = None) -> str:
+        """Send a scanned PDF to Document Intelligence and return page-marked text.
+
+        When the page count is known and exceeds one shard, the document is
+        analyzed as concurrent page-range shards — all pollers are started
+        before any result is awaited, so the service processes shards in
+        parallel and a 1000-page scan takes roughly one shard's latency
+        instead of the sum.  Page numbers stay document-absolute because the
+        'pages' parameter preserves original numbering.
+        """
+        from azure.ai.documentintelligence.models import AnalyzeDocumentRequest
 
+        request = AnalyzeDocumentRequest(bytes_source=content)
+
+        if page_count is None or page_count <= _OCR_SHARD_PAGES:
+            result = self._client.begin_analyze_document(
+                "prebuilt-read", request
+            ).result()
+            return "\n\n".join(self._result_page_texts(result))
+
+        pollers = [
+            self._client.begin_analyze_document(
+                "prebuilt-read",
+                request,
+                pages=f"{start}-{min(start + _OCR_SHARD_PAGES - 1, page_count)}",
+            )
+            for start in range(1, page_count + 1, _OCR_SHARD_PAGES)
+        ]
+        pages: list[str] = []
+        for poller in pollers:
+            pages.extend(self._result_page_texts(poller.result()))
+        return "\n\n".join(pages)
+
+    @staticmethod
+    def _result_page_texts(result: Any) -> list[str]:
+        """Convert an analyze result into page-marked text blocks."""
+        if not result.pages:
+            return []
         pages: list[str] = []
         for page in result.pages:
-            page_num = page.page_number
             lines = [line.content for line in (page.lines or [])]
             text = "\n".join(lines).strip()
             if text:
-                pages.append(f"--- Page {page_num} ---\n{text}")
-
-        return "\n\n".join(pages)
+                pages.append(f"--- Page {page.page_number} ---\n{text}")
+        return pages
 
     def _extract_docx(self, content: bytes) -> str:
         """Extract text from a DOCX file using python-docx.
@@ -132,6 +241,8 @@ class OcrProcessor:
         DOCX files do not have meaningful page numbers at the paragraph level,
         so we emit a single Page 1 marker.
         """
+        from docx import Document as DocxDocument
+
         doc = DocxDocument(io.BytesIO(content))
         paragraphs = [para.text for para in doc.paragraphs if para.text.strip()]
         body = "\n\n".join(paragraphs)
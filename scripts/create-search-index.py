@@ -12,26 +12,42 @@ Environment variables (or set in .env):
 
 import json
 import os
+import re
 import sys
 from pathlib import Path
 
+try:
+    # orjson round-trips the schema 2-3x faster; stdlib json is a fine fallback
+    # for a one-shot provisioning script
+    import orjson
+except ImportError:
+    orjson = None
+
 # Allow running from project root or scripts/ directory
 REPO_ROOT = Path(__file__).resolve().parent.parent
 SCHEMA_PATH = REPO_ROOT / "infra" / "search-config" / "index-schema.json"
 SKILLSET_PATH = REPO_ROOT / "infra" / "search-config" / "skillset.json"
 
+_ENV_RE = re.compile(r"\$\{([^}]+)\}")
+
+
+def _load_json(path: Path) -> dict:
+    """Parse a JSON file, preferring orjson when installed."""
+    data = path.read_bytes()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
 
 def load_env() -> None:
     """Load .env file from repo root if it exists (no external dependency needed)."""
     env_file = REPO_ROOT / ".env"
     if not env_file.exists():
         return
-    with open(env_file) as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith("#") and "=" in line:
-                key, _, value = line.partition("=")
-                os.environ.setdefault(key.strip(), value.strip().strip('"').strip("'"))
+    # One read + splitlines instead of buffered per-line iteration
+    for line in env_file.read_text().splitlines():
+        line = line.strip()
+        if line and not line.startswith("#") and "=" in line:
+            key, _, value = line.partition("=")
+            os.environ.setdefault(key.strip(), value.strip().strip('"').strip("'"))
 
 
 def get_search_client():
@@ -64,9 +80,11 @@ def get_search_client():
 
 
 def substitute_env_vars(obj: dict) -> dict:
-    """Recursively replace ${VAR_NAME} placeholders with environment variable values."""
-    text = json.dumps(obj)
-    import re
+    """Recursively replace ${VAR_NAME} placeholders with environment variable values.
+
+    Walks dict/list nodes and substitutes on str leaves only — no JSON
+    dump/parse round-trip of the whole schema.
+    """
     def replacer(match: re.Match) -> str:
         var_name = match.group(1)
         value = os.environ.get(var_name, "")
@@ -74,8 +92,17 @@ def substitute_env_vars(obj: dict) -> dict:
             print(f"  WARNING: ${{{var_name}}} is not set in environment — leaving placeholder.")
             return match.group(0)
         return value
-    text = re.sub(r"\$\{([^}]+)\}", replacer, text)
-    return json.loads(text)
+
+    def walk(node):
+        if isinstance(node, str):
+            return _ENV_RE.sub(replacer, node)
+        if isinstance(node, dict):
+            return {key: walk(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [walk(value) for value in node]
+        return node
+
+    return walk(obj)
 
 
 def create_or_update_index(client, schema: dict) -> None:
@@ -140,15 +167,13 @@ def main() -> None:
         sys.exit(1)
 
     print(f"\nLoading index schema from: {SCHEMA_PATH}")
-    with open(SCHEMA_PATH) as f:
-        raw_schema = json.load(f)
+    raw_schema = _load_json(SCHEMA_PATH)
     schema = substitute_env_vars(raw_schema)
 
     skillset: dict | None = None
     if SKILLSET_PATH.exists():
         print(f"Loading skillset from: {SKILLSET_PATH}")
-        with open(SKILLSET_PATH) as f:
-            raw_skillset = json.load(f)
+        raw_skillset = _load_json(SKILLSET_PATH)
         skillset = substitute_env_vars(raw_skillset)
     else:
         print(f"WARNING: Skillset file not found at {SKILLSET_PATH} — skipping skillset.")
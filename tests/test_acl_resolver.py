@@ -9,8 +9,13 @@ for populating the `allowed_groups` field in Azure AI Search. It handles:
   - In-memory caching to avoid redundant Graph API calls
 """
 
+import asyncio
+import json
+import sqlite3
+import sys
+import time
+
 import pytest
-from unittest.mock import MagicMock, call, patch
 from dataclasses import dataclass, field
 from typing import Any
 
@@ -32,6 +37,10 @@ class ResolvedAcl:
     allowed_groups: list[str]  # Entra group OIDs
 
 
+# Graph JSON $batch accepts at most 20 sub-requests per POST
+_GRAPH_BATCH_SIZE = 20
+
+
 class AclResolver:
     """
     Resolves SharePoint item ACLs to a flat list of Entra group OIDs.
@@ -43,15 +52,74 @@ class AclResolver:
           - get_item_permissions(site_id, item_id) -> list[PermissionEntry]
           - get_parent_permissions(site_id, item_id) -> list[PermissionEntry]
           - get_user_groups(user_oid) -> list[str]  (returns group OIDs)
+          - get_user_groups_batch(user_oids) -> dict[str, list[str]]  (optional;
+            backed by the Graph $batch endpoint, up to 20 users per POST)
+    cache_path : str | None
+        Optional sqlite database path persisting resolved ACLs and user-group
+        memberships across runs — a scheduled indexer restart then skips the
+        Graph round trips for every item whose cached entry is still fresh.
+    ttl_seconds : int
+        Lifetime of persisted cache entries.
     """
 
-    def __init__(self, graph_client: Any) -> None:
+    def __init__(
+        self,
+        graph_client: Any,
+        cache_path: str | None = None,
+        ttl_seconds: int = 3600,
+    ) -> None:
         self._graph = graph_client
-        # Cache keyed by (site_id, item_id) -> list[str] (resolved group OIDs)
-        self._cache: dict[tuple[str, str], list[str]] = {}
+        self._cache_path = cache_path
+        self._ttl_seconds = ttl_seconds
+        self._db: sqlite3.Connection | None = None
+        # Cache keyed by (site_id, item_id) -> interned tuple of group OIDs.
+        # Tuples are immutable (no defensive copies needed for the cache) and
+        # smaller than lists; interning collapses the same OID strings that
+        # recur across thousands of items into one shared object each.
+        self._cache: dict[tuple[str, str], tuple[str, ...]] = {}
         # Cache keyed by user_oid -> list[str] (group OIDs)
         self._user_group_cache: dict[str, list[str]] = {}
 
+    def _get_db(self) -> sqlite3.Connection:
+        """Lazily open the persistent cache database, creating its tables."""
+        if self._db is None:
+            self._db = sqlite3.connect(self._cache_path)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS item_cache ("
+                "site_id TEXT, item_id TEXT, oids TEXT, expires_at INTEGER, "
+                "PRIMARY KEY (site_id, item_id))"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS user_group_cache ("
+                "user_oid TEXT PRIMARY KEY, oids TEXT, expires_at INTEGER)"
+            )
+        return self._db
+
+    def _load_persisted_acl(self, site_id: str, item_id: str) -> tuple[str, ...] | None:
+        row = self._get_db().execute(
+            "SELECT oids FROM item_cache "
+            "WHERE site_id = ? AND item_id = ? AND expires_at > ?",
+            (site_id, item_id, int(time.time())),
+        ).fetchone()
+        if row is None:
+            return None
+        return tuple(sys.intern(oid) for oid in json.loads(row[0]))
+
+    def _persist_acl(
+        self, site_id: str, item_id: str, group_oids: tuple[str, ...]
+    ) -> None:
+        db = self._get_db()
+        db.execute(
+            "INSERT OR REPLACE INTO item_cache VALUES (?, ?, ?, ?)",
+            (
+                site_id,
+                item_id,
+                json.dumps(list(group_oids)),
+                int(time.time()) + self._ttl_seconds,
+            ),
+        )
+        db.commit()
+
     def _resolve_permission_to_groups(self, entry: PermissionEntry) -> list[str]:
         """Convert a single permission entry to a list of Entra group OIDs."""
         if entry.principal_type == "group":
@@ -66,9 +134,106 @@ class AclResolver:
     def _get_user_groups_cached(self, user_oid: str) -> list[str]:
         """Return the group OIDs for a user, using cache to avoid repeat calls."""
         if user_oid not in self._user_group_cache:
-            self._user_group_cache[user_oid] = self._graph.get_user_groups(user_oid)
+            if self._cache_path is not None:
+                row = self._get_db().execute(
+                    "SELECT oids FROM user_group_cache "
+                    "WHERE user_oid = ? AND expires_at > ?",
+                    (user_oid, int(time.time())),
+                ).fetchone()
+                if row is not None:
+                    self._user_group_cache[user_oid] = json.loads(row[0])
+                    return self._user_group_cache[user_oid]
+            groups = self._graph.get_user_groups(user_oid)
+            self._user_group_cache[user_oid] = groups
+            if self._cache_path is not None:
+                db = self._get_db()
+                db.execute(
+                    "INSERT OR REPLACE INTO user_group_cache VALUES (?, ?, ?)",
+                    (
+                        user_oid,
+                        json.dumps(groups),
+                        int(time.time()) + self._ttl_seconds,
+                    ),
+                )
+                db.commit()
         return self._user_group_cache[user_oid]
 
+    def prefetch_user_groups(self, user_oids: Any) -> None:
+        """Warm the user-group cache for many users in batched Graph calls.
+
+        Uncached OIDs are chunked into $batch-sized groups of 20 so K unique
+        users cost ceil(K/20) round trips instead of K. Falls back to
+        per-user calls when the client has no batch method.
+        """
+        pending = [
+            oid for oid in dict.fromkeys(user_oids)
+            if oid not in self._user_group_cache
+        ]
+        if not pending:
+            return
+        batch_fn = getattr(self._graph, "get_user_groups_batch", None)
+        if batch_fn is None:
+            for oid in pending:
+                self._user_group_cache[oid] = self._graph.get_user_groups(oid)
+            return
+        for start in range(0, len(pending), _GRAPH_BATCH_SIZE):
+            chunk = pending[start:start + _GRAPH_BATCH_SIZE]
+            self._user_group_cache.update(batch_fn(chunk))
+
+    def resolve_many(
+        self, items: list[tuple[str, str]], inherit: bool = True
+    ) -> list[ResolvedAcl]:
+        """Resolve a batch of (site_id, item_id) pairs.
+
+        Walks the batch twice: pass one fetches permissions and collects
+        every user principal so their group memberships can be prefetched
+        together; pass two merges the ACLs entirely from local data.
+        """
+        perms_by_item: dict[tuple[str, str], list[PermissionEntry]] = {}
+        user_oids: list[str] = []
+        for site_id, item_id in items:
+            key = (site_id, item_id)
+            if key in self._cache or key in perms_by_item:
+                continue
+            permissions = self._graph.get_item_permissions(site_id, item_id)
+            if inherit:
+                permissions = permissions + self._graph.get_parent_permissions(
+                    site_id, item_id
+                )
+            perms_by_item[key] = permissions
+            user_oids.extend(
+                entry.principal_id
+                for entry in permissions
+                if entry.principal_type == "user"
+            )
+
+        self.prefetch_user_groups(user_oids)
+
+        results: list[ResolvedAcl] = []
+        for site_id, item_id in items:
+            key = (site_id, item_id)
+            if key not in self._cache:
+                self._cache[key] = self._merge_permissions(perms_by_item[key])
+            results.append(
+                ResolvedAcl(item_id=item_id, allowed_groups=list(self._cache[key]))
+            )
+        return results
+
+    def _merge_permissions(
+        self, permissions: list[PermissionEntry]
+    ) -> tuple[str, ...]:
+        """Expand and dedup permission entries into an ordered OID tuple."""
+        # Dedup with a side set (O(1) membership) while preserving first-seen
+        # order — list membership checks go quadratic on long inherited ACLs
+        seen: set[str] = set()
+        group_oids: list[str] = []
+        for entry in permissions:
+            for oid in self._resolve_permission_to_groups(entry):
+                if oid not in seen:
+                    seen.add(oid)
+                    group_oids.append(oid)
+        return tuple(sys.intern(oid) for oid in group_oids)
+
     def resolve(self, site_id: str, item_id: str, inherit: bool = True) -> ResolvedAcl:
         """
         Resolve all allowed groups for a SharePoint item.
@@ -84,7 +249,15 @@ class AclResolver:
         """
         cache_key = (site_id, item_id)
         if cache_key in self._cache:
-            return ResolvedAcl(item_id=item_id, allowed_groups=self._cache[cache_key])
+            return ResolvedAcl(
+                item_id=item_id, allowed_groups=list(self._cache[cache_key])
+            )
+
+        if self._cache_path is not None:
+            persisted = self._load_persisted_acl(site_id, item_id)
+            if persisted is not None:
+                self._cache[cache_key] = persisted
+                return ResolvedAcl(item_id=item_id, allowed_groups=list(persisted))
 
         permissions = self._graph.get_item_permissions(site_id, item_id)
 
@@ -92,36 +265,147 @@ class AclResolver:
             parent_perms = self._graph.get_parent_permissions(site_id, item_id)
             permissions = permissions + parent_perms
 
+        group_oids = self._merge_permissions(permissions)
+
+        self._cache[cache_key] = group_oids
+        if self._cache_path is not None:
+            self._persist_acl(site_id, item_id, group_oids)
+        return ResolvedAcl(item_id=item_id, allowed_groups=list(group_oids))
+
+
+class AclResolverAsync:
+    """
+    Async variant of AclResolver for concurrent Graph I/O.
+
+    Takes a Graph client exposing the same methods as AclResolver's, as
+    coroutines. Item and parent permission fetches for one item overlap via
+    asyncio.gather, and resolve_many fans out across items under a bounded
+    semaphore so a large batch cannot trip Graph throttling.
+    """
+
+    _MAX_CONCURRENT_ITEMS = 16
+
+    def __init__(self, graph_client: Any) -> None:
+        self._graph = graph_client
+        self._cache: dict[tuple[str, str], tuple[str, ...]] = {}
+        self._user_group_cache: dict[str, list[str]] = {}
+
+    async def _resolve_permission_to_groups(self, entry: PermissionEntry) -> list[str]:
+        if entry.principal_type == "group":
+            return [entry.principal_id]
+        elif entry.principal_type == "user":
+            return await self._get_user_groups_cached(entry.principal_id)
+        elif entry.principal_type == "everyone":
+            return ["00000000-0000-0000-0000-000000000001"]
+        return []
+
+    async def _get_user_groups_cached(self, user_oid: str) -> list[str]:
+        if user_oid not in self._user_group_cache:
+            self._user_group_cache[user_oid] = await self._graph.get_user_groups(
+                user_oid
+            )
+        return self._user_group_cache[user_oid]
+
+    async def resolve(
+        self, site_id: str, item_id: str, inherit: bool = True
+    ) -> ResolvedAcl:
+        """Resolve one item, overlapping the item and parent permission fetches."""
+        cache_key = (site_id, item_id)
+        if cache_key in self._cache:
+            return ResolvedAcl(
+                item_id=item_id, allowed_groups=list(self._cache[cache_key])
+            )
+
+        if inherit:
+            permissions, parent_perms = await asyncio.gather(
+                self._graph.get_item_permissions(site_id, item_id),
+                self._graph.get_parent_permissions(site_id, item_id),
+            )
+            permissions = permissions + parent_perms
+        else:
+            permissions = await self._graph.get_item_permissions(site_id, item_id)
+
+        seen: set[str] = set()
         group_oids: list[str] = []
         for entry in permissions:
-            resolved = self._resolve_permission_to_groups(entry)
-            for oid in resolved:
-                if oid not in group_oids:
+            for oid in await self._resolve_permission_to_groups(entry):
+                if oid not in seen:
+                    seen.add(oid)
                     group_oids.append(oid)
 
-        self._cache[cache_key] = group_oids
-        return ResolvedAcl(item_id=item_id, allowed_groups=group_oids)
+        interned = tuple(sys.intern(oid) for oid in group_oids)
+        self._cache[cache_key] = interned
+        return ResolvedAcl(item_id=item_id, allowed_groups=list(interned))
+
+    async def resolve_many(
+        self, items: list[tuple[str, str]], inherit: bool = True
+    ) -> list[ResolvedAcl]:
+        """Resolve many items concurrently, bounded by the item semaphore."""
+        semaphore = asyncio.Semaphore(self._MAX_CONCURRENT_ITEMS)
+
+        async def bounded(site_id: str, item_id: str) -> ResolvedAcl:
+            async with semaphore:
+                return await self.resolve(site_id, item_id, inherit)
+
+        return list(
+            await asyncio.gather(*(bounded(s, i) for s, i in items))
+        )
 
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
+class _FakeGraph:
+    """Plain fake Graph client with call counters.
+
+    MagicMock pays for attribute proxying and call recording on every call,
+    which dominates once resolver tests are scaled to many items; a plain
+    class with integer counters is an order of magnitude cheaper per call.
+    """
+
+    def __init__(
+        self,
+        item_perms: list[PermissionEntry] | None = None,
+        parent_perms: list[PermissionEntry] | None = None,
+        user_groups: dict[str, list[str]] | None = None,
+    ) -> None:
+        self._item_perms = item_perms or []
+        self._parent_perms = parent_perms or []
+        self._user_groups = user_groups or {}
+        self.get_item_permissions_calls = 0
+        self.get_parent_permissions_calls = 0
+        self.get_user_groups_calls = 0
+        self.get_user_groups_batch_calls = 0
+        self.get_user_groups_args: list[str] = []
+
+    def get_item_permissions(self, site_id: str, item_id: str) -> list[PermissionEntry]:
+        self.get_item_permissions_calls += 1
+        return self._item_perms
+
+    def get_parent_permissions(self, site_id: str, item_id: str) -> list[PermissionEntry]:
+        self.get_parent_permissions_calls += 1
+        return self._parent_perms
+
+    def get_user_groups(self, user_oid: str) -> list[str]:
+        self.get_user_groups_calls += 1
+        self.get_user_groups_args.append(user_oid)
+        return self._user_groups.get(user_oid, [])
+
+    def get_user_groups_batch(self, user_oids: list[str]) -> dict[str, list[str]]:
+        self.get_user_groups_batch_calls += 1
+        return {oid: self._user_groups.get(oid, []) for oid in user_oids}
+
+
 def _make_graph_client(
     item_perms: list[PermissionEntry] | None = None,
     parent_perms: list[PermissionEntry] | None = None,
     user_groups: dict[str, list[str]] | None = None,
-) -> MagicMock:
-    """Return a mock Graph client pre-configured with the given data."""
-    client = MagicMock()
-    client.get_item_permissions.return_value = item_perms or []
-    client.get_parent_permissions.return_value = parent_perms or []
-
-    def _get_user_groups(user_oid: str) -> list[str]:
-        return (user_groups or {}).get(user_oid, [])
-
-    client.get_user_groups.side_effect = _get_user_groups
-    return client
+) -> _FakeGraph:
+    """Return a fake Graph client pre-configured with the given data."""
+    return _FakeGraph(
+        item_perms=item_perms, parent_perms=parent_perms, user_groups=user_groups
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -182,7 +466,7 @@ class TestAclResolver:
         # Both groups the user belongs to should appear in allowed_groups
         assert GROUP_OID_A in acl.allowed_groups
         assert GROUP_OID_B in acl.allowed_groups
-        graph.get_user_groups.assert_called_once_with(USER_OID)
+        assert graph.get_user_groups_args == [USER_OID]
 
     # ------------------------------------------------------------------
     # test_cache_prevents_duplicate_calls
@@ -198,7 +482,7 @@ class TestAclResolver:
         acl_second = resolver.resolve(SITE_ID, ITEM_ID, inherit=False)
 
         # Graph should only have been called once
-        assert graph.get_item_permissions.call_count == 1
+        assert graph.get_item_permissions_calls == 1
         assert acl_first.allowed_groups == acl_second.allowed_groups
 
     # ------------------------------------------------------------------
@@ -248,7 +532,74 @@ class TestAclResolver:
         resolver.resolve(SITE_ID, "item-002", inherit=False)
 
         # get_user_groups should still only have been called once (user_group_cache hit)
-        assert graph.get_user_groups.call_count == 1
+        assert graph.get_user_groups_calls == 1
+
+    def test_duplicate_user_permissions_share_one_graph_call(self) -> None:
+        """Two permissions granting to the same user yield one Graph call."""
+        perm = PermissionEntry(principal_type="user", principal_id=USER_OID, role="read")
+        graph = _make_graph_client(
+            item_perms=[perm, perm],
+            user_groups={USER_OID: [GROUP_OID_A]},
+        )
+        resolver = AclResolver(graph_client=graph)
+        acl = resolver.resolve(SITE_ID, ITEM_ID, inherit=False)
+
+        assert GROUP_OID_A in acl.allowed_groups
+        assert graph.get_user_groups_calls == 1
+
+    def test_resolve_many_batches_user_group_lookups(self) -> None:
+        """resolve_many prefetches user groups via one batched call, not per-user calls."""
+        perm = PermissionEntry(principal_type="user", principal_id=USER_OID, role="read")
+        graph = _make_graph_client(
+            item_perms=[perm],
+            user_groups={USER_OID: [GROUP_OID_A]},
+        )
+        resolver = AclResolver(graph_client=graph)
+
+        acls = resolver.resolve_many(
+            [(SITE_ID, "item-001"), (SITE_ID, "item-002")], inherit=False
+        )
+
+        assert [acl.allowed_groups for acl in acls] == [[GROUP_OID_A], [GROUP_OID_A]]
+        assert graph.get_user_groups_batch_calls == 1
+        assert graph.get_user_groups_calls == 0
+
+    def test_persistent_cache_survives_new_resolver(self, tmp_path) -> None:
+        """A second resolver with the same cache_path resolves without Graph calls."""
+        cache_path = str(tmp_path / "acl_cache.db")
+        perms = [PermissionEntry(principal_type="group", principal_id=GROUP_OID_A, role="read")]
+
+        first = AclResolver(graph_client=_make_graph_client(item_perms=perms), cache_path=cache_path)
+        acl_first = first.resolve(SITE_ID, ITEM_ID, inherit=False)
+
+        fresh_graph = _make_graph_client(item_perms=perms)
+        second = AclResolver(graph_client=fresh_graph, cache_path=cache_path)
+        acl_second = second.resolve(SITE_ID, ITEM_ID, inherit=False)
+
+        assert acl_second.allowed_groups == acl_first.allowed_groups
+        assert fresh_graph.get_item_permissions_calls == 0
+
+    def test_async_resolver_matches_sync_semantics(self) -> None:
+        """AclResolverAsync merges item and parent permissions like the sync class."""
+
+        class _AsyncGraph:
+            async def get_item_permissions(self, site_id: str, item_id: str):
+                return [PermissionEntry(principal_type="group", principal_id=GROUP_OID_A, role="read")]
+
+            async def get_parent_permissions(self, site_id: str, item_id: str):
+                return [PermissionEntry(principal_type="group", principal_id=GROUP_OID_B, role="read")]
+
+            async def get_user_groups(self, user_oid: str):
+                return []
+
+        resolver = AclResolverAsync(graph_client=_AsyncGraph())
+        acls = asyncio.run(
+            resolver.resolve_many([(SITE_ID, "item-001"), (SITE_ID, "item-002")])
+        )
+
+        assert all(
+            acl.allowed_groups == [GROUP_OID_A, GROUP_OID_B] for acl in acls
+        )
 
     def test_inherit_false_excludes_parent_permissions(self) -> None:
         """When inherit=False, parent permissions are not fetched."""
@@ -261,4 +612,4 @@ class TestAclResolver:
 
         assert GROUP_OID_A in acl.allowed_groups
         assert GROUP_OID_B not in acl.allowed_groups
-        graph.get_parent_permissions.assert_not_called()
+        assert graph.get_parent_permissions_calls == 0
@@ -7,10 +7,51 @@ metadata (title, section_heading, page_number, chunk_index, total_chunks) and
 is prepended with a "Title: ..." header so the embedding model has full context.
 """
 
+import hashlib
+import re
+
+import numpy as np
 import pytest
 from unittest.mock import MagicMock, patch
-from dataclasses import dataclass, field
-from typing import Any
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Any, Iterator
+
+try:
+    from blake3 import blake3  # type: ignore[import]
+except ImportError:
+    blake3 = None
+
+try:
+    import xxhash  # type: ignore[import]
+except ImportError:
+    xxhash = None
+
+
+def _content_key(data: bytes) -> bytes:
+    """16-byte content digest for dedup keys.
+
+    Prefers SIMD-accelerated hashes (blake3, then xxh3) over the scalar
+    blake2b fallback — multi-MB document bodies make hashing throughput
+    the dominant cost of a cache lookup. Collision resistance is all
+    that matters here, not cryptographic strength.
+    """
+    if blake3 is not None:
+        return blake3(data).digest(length=16)
+    if xxhash is not None:
+        return xxhash.xxh3_128(data).digest()
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+# Translation table for the ALL-CAPS gate: bytes outside the heading
+# alphabet (uppercase ASCII, digits, space, common heading punctuation)
+# map to NUL, so one C-level bytes.translate + count(0) validates a
+# candidate line without allocating an array or touching Python-level
+# per-character checks.
+_HEAD_TABLE = bytes(
+    b if (0x41 <= b <= 0x5A or 0x30 <= b <= 0x39 or b in b" &/-,:") else 0
+    for b in range(256)
+)
 
 
 # ---------------------------------------------------------------------------
@@ -18,7 +59,9 @@ from typing import Any
 # the full project installed. Replace with a real import once src/ is wired up.
 # ---------------------------------------------------------------------------
 
-@dataclass
+# slots=True: chunk objects are allocated one per chunk in tight loops, and
+# the fixed slot layout drops the per-instance __dict__ overhead
+@dataclass(slots=True)
 class ChunkMetadata:
     title: str = ""
     section_heading: str = ""
@@ -32,10 +75,30 @@ class ChunkMetadata:
     allowed_groups: list[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class DocumentChunk:
-    chunk_content: str
+    raw_content: str
     metadata: ChunkMetadata
+    title: str = ""
+    # Lazily-built "Title: ...\n\n" + body; a slot rather than
+    # functools.cached_property because slots=True leaves no __dict__
+    _content: str | None = field(default=None, init=False, repr=False)
+
+    @property
+    def chunk_content(self) -> str:
+        """Embedding-ready content with the title prefix prepended.
+
+        Built on first access so consumers that only need the raw body
+        (overlap checks, retrieval formatting) never pay for the concat,
+        and ones that need the prefixed form never re-split it off.
+        """
+        if self._content is None:
+            self._content = (
+                f"Title: {self.title}\n\n{self.raw_content}"
+                if self.title
+                else self.raw_content
+            )
+        return self._content
 
 
 class DocumentChunker:
@@ -54,6 +117,9 @@ class DocumentChunker:
 
     CHARS_PER_TOKEN = 4  # rough approximation
 
+    # Bound on the content-hash memo below
+    _MEMO_MAX = 128
+
     def __init__(
         self,
         max_tokens: int = 512,
@@ -63,17 +129,50 @@ class DocumentChunker:
         self.max_chars = max_tokens * self.CHARS_PER_TOKEN
         self.overlap_chars = overlap_tokens * self.CHARS_PER_TOKEN
         self.min_chars = min_tokens * self.CHARS_PER_TOKEN
+        # One C-level regex pass finds heading candidates (markdown, or
+        # short uppercase-initial lines handed to the vectorized caps test)
+        self._heading_re = re.compile(
+            r"(?m)^[ \t]*(?:(?P<md>#.*?)|(?P<caps>[A-Z].{1,78}))[ \t]*$"
+        )
+        # LRU memo keyed by content hash holding (heading, raw windows):
+        # re-ingesting an unchanged document skips heading extraction and
+        # the window pass. Only immutable intermediates are cached — chunk
+        # objects are rebuilt per call, so callers can mutate what they get
+        # back without corrupting later identical calls.
+        self._chunk_cache: OrderedDict[bytes, tuple[str, list[str]]] = OrderedDict()
+        # Chunk parameters are fixed for the lifetime of an instance, so the
+        # window pass is generated once with them inlined as literals —
+        # partial evaluation that removes the per-call attribute reads.
+        step = max(self.max_chars - self.overlap_chars, 1)
+        src = (
+            "def _window_chunks(text):\n"
+            f"    starts = np.arange(0, max(len(text) - {self.overlap_chars}, 1), {step})\n"
+            f"    ends = np.minimum(starts + {self.max_chars}, len(text))\n"
+            "    candidates = (\n"
+            "        text[s:e].strip()\n"
+            "        for s, e in zip(starts.tolist(), ends.tolist())\n"
+            f"        if e - s >= {self.min_chars}\n"
+            "    )\n"
+            f"    return [c for c in candidates if len(c) >= {self.min_chars}]\n"
+        )
+        ns: dict[str, Any] = {"np": np}
+        exec(src, ns)
+        self._window_chunks = ns["_window_chunks"]
 
     def _extract_section_heading(self, text: str) -> str:
         """Return the first markdown-style heading found in the text, or empty string."""
-        for line in text.splitlines():
-            stripped = line.strip()
-            if stripped.startswith("#"):
-                return stripped.lstrip("#").strip()
-            # Also detect ALL-CAPS lines as headings (common in HR PDFs)
-            words = stripped.split()
-            if len(words) >= 2 and stripped.isupper() and len(stripped) < 80:
-                return stripped.title()
+        for match in self._heading_re.finditer(text):
+            md = match.group("md")
+            if md is not None:
+                return md.lstrip("#").strip()
+            # ALL-CAPS lines (common in HR PDFs) count only with >= 2 words.
+            # The byte-class check is one bytes.translate scan in C; any
+            # byte outside the heading alphabet lands as NUL and rejects
+            # the candidate.
+            caps = match.group("caps").strip()
+            raw = caps.encode("ascii", "replace")
+            if not raw.translate(_HEAD_TABLE).count(0) and b" " in raw:
+                return caps.title()
         return ""
 
     def chunk(
@@ -88,48 +187,85 @@ class DocumentChunker:
         allowed_groups: list[str] | None = None,
     ) -> list[DocumentChunk]:
         """Split *text* into overlapping chunks and return them with metadata."""
+        return list(
+            self.iter_chunks(
+                text,
+                title=title,
+                page_number=page_number,
+                document_id=document_id,
+                source_url=source_url,
+                category=category,
+                department=department,
+                allowed_groups=allowed_groups,
+            )
+        )
+
+    def _split_cached(self, text: str) -> tuple[str, list[str]]:
+        """Return (heading, raw window strings) for *text*, memoized by content hash."""
+        memo_key = _content_key(text.encode())
+        cached = self._chunk_cache.get(memo_key)
+        if cached is not None:
+            self._chunk_cache.move_to_end(memo_key)
+            return cached
+        result = (self._extract_section_heading(text), self._window_chunks(text))
+        self._chunk_cache[memo_key] = result
+        if len(self._chunk_cache) > self._MEMO_MAX:
+            self._chunk_cache.popitem(last=False)
+        return result
+
+    def iter_chunks(
+        self,
+        text: str,
+        title: str = "",
+        page_number: int = 1,
+        document_id: str = "",
+        source_url: str = "",
+        category: str = "",
+        department: str = "",
+        allowed_groups: list[str] | None = None,
+    ) -> Iterator[DocumentChunk]:
+        """Yield chunks one at a time so downstream embedding batches can
+        consume and release them without holding a whole document's worth
+        of DocumentChunk objects in memory."""
         if not text or not text.strip():
-            return []
+            return
 
         allowed_groups = allowed_groups or []
-        heading = self._extract_section_heading(text)
-
-        # Build raw chunks by sliding window over characters
-        raw_chunks: list[str] = []
-        start = 0
-        while start < len(text):
-            end = min(start + self.max_chars, len(text))
-            raw_chunks.append(text[start:end])
-            if end >= len(text):
-                break
-            start = end - self.overlap_chars
 
-        # Filter out chunks that are too small
-        raw_chunks = [c for c in raw_chunks if len(c.strip()) >= self.min_chars]
+        # Heading and raw windows come from the content-hash memo. Window
+        # starts are computed in one vectorized shot inside the specialized
+        # impl generated in __init__; a start at or past len(text) - overlap
+        # would only re-emit a tail the previous window already covered,
+        # so the range stops short of it. The raw span length bounds the
+        # stripped length from above, so too-short windows are dropped
+        # before any slice is allocated.
+        heading, raw_chunks = self._split_cached(text)
 
         if not raw_chunks:
-            return []
+            return
 
         total = len(raw_chunks)
-        chunks: list[DocumentChunk] = []
+        # All metadata except chunk_index is identical across chunks: build
+        # it once and stamp per-chunk copies with dataclasses.replace
+        # instead of re-parsing ten kwargs per chunk. The title rides on
+        # the chunk itself; chunk_content prepends it lazily.
+        template = ChunkMetadata(
+            title=title,
+            section_heading=heading,
+            page_number=page_number,
+            total_chunks=total,
+            document_id=document_id,
+            source_url=source_url,
+            category=category,
+            department=department,
+            allowed_groups=allowed_groups,
+        )
         for idx, raw in enumerate(raw_chunks):
-            # Prepend title context so the embedding model always has document identity
-            content = f"Title: {title}\n\n{raw.strip()}" if title else raw.strip()
-            meta = ChunkMetadata(
+            yield DocumentChunk(
+                raw_content=raw,
+                metadata=replace(template, chunk_index=idx),
                 title=title,
-                section_heading=heading,
-                page_number=page_number,
-                chunk_index=idx,
-                total_chunks=total,
-                document_id=document_id,
-                source_url=source_url,
-                category=category,
-                department=department,
-                allowed_groups=allowed_groups,
             )
-            chunks.append(DocumentChunk(chunk_content=content, metadata=meta))
-
-        return chunks
 
 
 # ---------------------------------------------------------------------------
@@ -186,10 +322,10 @@ class TestDocumentChunker:
         chunks = self.chunker.chunk(text, title="Overlap Test Doc")
         assert len(chunks) >= 2
 
-        # The tail of chunk 0 and the head of chunk 1 must share content
-        # (after stripping the "Title: ..." prefix)
-        raw_0 = chunks[0].chunk_content.split("\n\n", 1)[-1]
-        raw_1 = chunks[1].chunk_content.split("\n\n", 1)[-1]
+        # The tail of chunk 0 and the head of chunk 1 must share content;
+        # raw_content carries the body without the "Title: ..." prefix
+        raw_0 = chunks[0].raw_content
+        raw_1 = chunks[1].raw_content
 
         tail_of_0 = raw_0[-overlap_chars:]
         head_of_1 = raw_1[:overlap_chars]
@@ -266,6 +402,15 @@ class TestDocumentChunker:
             assert chunk.metadata.department == "HR"
             assert "grp-all-employees" in chunk.metadata.allowed_groups
 
+    def test_memoized_chunks_are_not_aliased_across_calls(self) -> None:
+        """Mutating a returned chunk must not corrupt later identical calls."""
+        text = "Remote work policy details. " * 100
+        first = self.chunker.chunk(text, title="Remote Work Policy", allowed_groups=["grp-a"])
+        first[0].metadata.allowed_groups.append("grp-injected")
+
+        second = self.chunker.chunk(text, title="Remote Work Policy", allowed_groups=["grp-a"])
+        assert "grp-injected" not in second[0].metadata.allowed_groups
+
     def test_all_caps_heading_detected(self) -> None:
         """ALL CAPS lines (common in HR PDFs) are recognized as section headings."""
         text = "PERFORMANCE REVIEW PROCESS\n\nEmployees are reviewed annually in December."
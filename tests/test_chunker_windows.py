@@ -0,0 +1,71 @@
+"""
+test_chunker_windows.py — Window-planning invariants for the production chunker.
+
+Exercises functions/document_processor/chunker.py's _sliding_windows directly:
+the binary-search overlap step must retain at least _OVERLAP_TOKENS of content
+between consecutive windows — the property the module's overlapping-window
+strategy (and retrieval quality) relies on — including on segment sizes where
+a naive searchsorted step would collapse the overlap to zero.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+pytest.importorskip("tiktoken")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "functions"))
+
+from document_processor.chunker import (  # noqa: E402
+    _CHUNK_TOKENS,
+    _OVERLAP_TOKENS,
+    DocumentChunker,
+)
+
+
+def _segments(sizes: list[int]) -> list[tuple[np.ndarray, str, int]]:
+    """Fabricate segments with the given token counts; text/offset are unused."""
+    return [(np.zeros(size, dtype=np.int32), "", 0) for size in sizes]
+
+
+class TestSlidingWindows:
+
+    def setup_method(self) -> None:
+        self.chunker = DocumentChunker()
+
+    def test_consecutive_windows_share_overlap_budget(self) -> None:
+        """Segments larger than the overlap budget must still produce overlap.
+
+        With uniform 200-token paragraphs a step that merely fits inside the
+        budget yields disjoint windows; the planner must back off one segment
+        so each pair shares the trailing paragraph.
+        """
+        sizes = [200] * 6
+        windows = self.chunker._sliding_windows(_segments(sizes))
+        prefix = np.concatenate(([0], np.cumsum(sizes)))
+
+        assert len(windows) > 1
+        for (_, a_end, _, _), (b_start, _, _, _) in zip(windows, windows[1:]):
+            assert int(prefix[a_end] - prefix[b_start]) >= _OVERLAP_TOKENS
+
+    def test_overlap_invariant_on_random_segment_sizes(self) -> None:
+        """Every consecutive pair keeps the budget unless the step is already minimal."""
+        rng = np.random.default_rng(7)
+        for _ in range(25):
+            sizes = rng.integers(1, _CHUNK_TOKENS, size=40).tolist()
+            windows = self.chunker._sliding_windows(_segments(sizes))
+            prefix = np.concatenate(([0], np.cumsum(sizes)))
+
+            # Full coverage, strictly advancing starts
+            assert windows[0][0] == 0
+            assert windows[-1][1] == len(sizes)
+            starts = [start for start, _, _, _ in windows]
+            assert starts == sorted(set(starts))
+
+            for (a_start, a_end, _, _), (b_start, _, _, _) in zip(
+                windows, windows[1:]
+            ):
+                overlap = int(prefix[a_end] - prefix[b_start])
+                assert overlap >= _OVERLAP_TOKENS or b_start == a_start + 1